@@ -1,11 +1,17 @@
 """Action engine for executing remediation steps with audit trail."""
 
+import functools
 import json
 import os
 import platform
 import subprocess
 from typing import Dict, Optional, Tuple
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 from .db_postgres import get_db_connection
 
 
@@ -33,6 +39,16 @@ def _config_path() -> str:
     return os.environ.get('SYSTEMDASHBOARD_CONFIG') or os.path.join(_repo_root(), 'config.json')
 
 
+@functools.lru_cache(maxsize=4)
+def _read_config(cfg_path: str, mtime_ns: int, size: int) -> Dict:
+    """Parse the config file; cached per (path, mtime, size) so edits are picked up."""
+    if orjson is not None:
+        with open(cfg_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(cfg_path, 'r') as f:
+        return json.load(f)
+
+
 def load_action_policy() -> Dict:
     policy = {
         'allow_auto_execute': False,
@@ -41,12 +57,13 @@ def load_action_policy() -> Dict:
     }
 
     cfg_path = _config_path()
-    if not os.path.exists(cfg_path):
+    try:
+        st = os.stat(cfg_path)
+    except OSError:
         return policy
 
     try:
-        with open(cfg_path, 'r') as f:
-            cfg = json.load(f)
+        cfg = _read_config(cfg_path, st.st_mtime_ns, st.st_size)
         actions_cfg = cfg.get('Actions', {})
         policy['allow_auto_execute'] = bool(actions_cfg.get('AllowAutoExecute', policy['allow_auto_execute']))
         policy['require_approval'] = bool(actions_cfg.get('RequireApproval', policy['require_approval']))
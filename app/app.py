@@ -44,6 +44,9 @@ CHATTY_THRESHOLD = int(os.environ.get('CHATTY_THRESHOLD', '500'))
 AUTH_FAILURE_THRESHOLD = int(os.environ.get('AUTH_FAILURE_THRESHOLD', '10'))
 VALID_FEEDBACK_STATUSES = {'Pending', 'Viewed', 'Resolved'}
 
+# Display timezone for all API timestamps; resolved once instead of per call
+EST_TZ = ZoneInfo("America/New_York")
+
 SYSLOG_SEVERITY = {
     0: 'Emergency',
     1: 'Alert',
@@ -144,7 +147,6 @@ def _get_db_cursor(conn):
 def _to_est_string(value):
     if value is None:
         return ''
-    tz = ZoneInfo("America/New_York")
     dt = None
 
     if isinstance(value, datetime.datetime):
@@ -158,8 +160,8 @@ def _to_est_string(value):
                 dt = None
         else:
             try:
-                if value.endswith('Z'):
-                    value = value.replace('Z', '+00:00')
+                # fromisoformat is implemented in C and accepts a trailing
+                # 'Z' natively on Python 3.11+ (already required for datetime.UTC)
                 dt = datetime.datetime.fromisoformat(value)
             except Exception:
                 return value
@@ -170,7 +172,7 @@ def _to_est_string(value):
         return ''
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=datetime.UTC)
-    return dt.astimezone(tz).isoformat()
+    return dt.astimezone(EST_TZ).isoformat()
 
 
 def _isoformat(value):
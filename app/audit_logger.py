@@ -42,6 +42,15 @@ class SensitiveDataMasker:
             'authorization': re.compile(r'(Authorization["\']?\s*:\s*["\']?(?:Bearer|Basic)\s+)([^\s"\']+)', re.IGNORECASE),
         }
         
+        # Replacement for each standard pattern; values become asterisks,
+        # MAC addresses keep the first 6 characters (OUI - first two octets)
+        self._replacements = {
+            'password': r'\1********',
+            'api_key': r'\1********',
+            'mac_address': r'\2:\3:**:**:**',
+            'authorization': r'\1********',
+        }
+        
         # Optional patterns (disabled by default)
         self._optional_patterns = {
             'ip_address': re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b'),
@@ -68,12 +77,7 @@ class SensitiveDataMasker:
         
         # Apply standard patterns
         for pattern_name, pattern in self._patterns.items():
-            if pattern_name == 'mac_address':
-                # Keep first 6 characters (OUI - first two octets), mask the rest
-                result = pattern.sub(r'\2:\3:**:**:**', result)
-            else:
-                # Replace value with asterisks
-                result = pattern.sub(r'\1********', result)
+            result = pattern.sub(self._replacements[pattern_name], result)
         
         # Apply optional patterns
         if self._mask_ips:
@@ -22,18 +22,21 @@ logger = logging.getLogger(__name__)
 class ConnectionPool:
     """Simple connection pool for SQLite with thread-safe access."""
     
-    def __init__(self, db_path: str, max_connections: int = 5, timeout: int = 10):
+    def __init__(self, db_path: str, max_connections: int = 5, timeout: int = 10,
+                 uri: bool = False):
         """
         Initialize connection pool.
         
         Args:
-            db_path: Path to SQLite database file
+            db_path: Path to SQLite database file (or a file: URI when uri is True)
             max_connections: Maximum number of connections in pool
             timeout: Timeout in seconds for database operations
+            uri: Interpret db_path as an SQLite URI (e.g. shared-cache memory databases)
         """
         self.db_path = db_path
         self.max_connections = max_connections
         self.timeout = timeout
+        self.uri = uri
         self.connections: List[sqlite3.Connection] = []
         self.in_use: set = set()
         self.lock = Lock()
@@ -41,15 +44,18 @@ class ConnectionPool:
     def _create_connection(self) -> sqlite3.Connection:
         """Create a new database connection with proper settings."""
         # Ensure directory exists
-        db_dir = os.path.dirname(self.db_path)
-        if db_dir and not os.path.exists(db_dir):
-            os.makedirs(db_dir, exist_ok=True)
+        if not self.uri:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
             
         conn = sqlite3.connect(
             self.db_path,
             timeout=self.timeout,
             check_same_thread=False,  # Allow connection reuse across threads
-            isolation_level=None  # Autocommit mode for better concurrency
+            isolation_level=None,  # Autocommit mode for better concurrency
+            cached_statements=256,  # Pooled connections live long; keep parsed statements
+            uri=self.uri
         )
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         
@@ -157,14 +163,16 @@ class DatabaseManager:
         self.pool = ConnectionPool(db_path)
         self._validated = False
         
-    def execute_with_retry(self, query: str, params: tuple = None, max_retries: Optional[int] = None) -> Any:
+    def execute_with_retry(self, query: str, params: tuple = None, max_retries: Optional[int] = None,
+                           many: bool = False) -> Any:
         """
         Execute a query with exponential backoff retry logic.
         
         Args:
             query: SQL query to execute
-            params: Query parameters
+            params: Query parameters (a sequence of parameter tuples when many is True)
             max_retries: Maximum retry attempts (uses instance default if None)
+            many: Run the query once per parameter tuple, in a single transaction
             
         Returns:
             Query result
@@ -180,7 +188,19 @@ class DatabaseManager:
             try:
                 with self.pool.get_connection() as conn:
                     cursor = conn.cursor()
-                    if params:
+                    if many:
+                        # Pool connections autocommit, so open a transaction
+                        # to commit the whole batch at once
+                        cursor.execute('BEGIN')
+                        try:
+                            cursor.executemany(query, params)
+                        except Exception:
+                            if conn.in_transaction:
+                                conn.rollback()
+                            raise
+                        conn.commit()
+                        return cursor
+                    elif params:
                         cursor.execute(query, params)
                     else:
                         cursor.execute(query)
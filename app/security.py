@@ -15,7 +15,7 @@ import hmac
 import time
 from functools import wraps
 from typing import Optional, Dict, Any, Callable
-from flask import request, jsonify, Response, make_response
+from flask import request, jsonify, Response, make_response, current_app
 import logging
 
 logger = logging.getLogger(__name__)
@@ -108,6 +108,7 @@ class APIKeyAuth:
     
     def __init__(self):
         self._api_keys: Dict[str, str] = {}  # {key_name: hashed_key}
+        self._single_digest: Optional[str] = None
         self._enabled = False
         self._load_from_environment()
     
@@ -120,6 +121,29 @@ class APIKeyAuth:
             self._api_keys['default'] = hashed
             self._enabled = True
             logger.info("API key authentication enabled (loaded from environment)")
+        self._specialize()
+    
+    def _specialize(self) -> None:
+        """
+        Install the fastest verify_key implementation for the current key set.
+        
+        The overwhelmingly common deployment has exactly one key (from
+        DASHBOARD_API_KEY), so that shape gets a direct digest comparison
+        instead of a scan over the stored key dictionary.
+        """
+        if len(self._api_keys) == 1:
+            self._single_digest = next(iter(self._api_keys.values()))
+            self.verify_key = self._verify_single
+        else:
+            self._single_digest = None
+            self.__dict__.pop('verify_key', None)
+    
+    def _verify_single(self, key: str) -> bool:
+        """Verify an API key against the single stored digest."""
+        if not self._enabled or not key:
+            return not self._enabled  # If auth disabled, allow access
+        
+        return hmac.compare_digest(self._hash_key(key), self._single_digest)
     
     def _hash_key(self, key: str) -> str:
         """Hash an API key using SHA-256."""
@@ -136,6 +160,7 @@ class APIKeyAuth:
         hashed = self._hash_key(key)
         self._api_keys[name] = hashed
         self._enabled = True
+        self._specialize()
         logger.info(f"API key '{name}' added")
     
     def remove_key(self, name: str = 'default') -> bool:
@@ -152,6 +177,7 @@ class APIKeyAuth:
             del self._api_keys[name]
             if not self._api_keys:
                 self._enabled = False
+            self._specialize()
             logger.info(f"API key '{name}' removed")
             return True
         return False
@@ -191,6 +217,22 @@ def get_api_key_auth() -> APIKeyAuth:
     return _api_key_auth
 
 
+def configure_api_key_auth(app, auth: Optional[APIKeyAuth] = None) -> None:
+    """
+    Register an API key authentication instance on the Flask app.
+    
+    @require_api_key resolves the instance from ``app.extensions`` so each
+    app can carry its own key set; apps that never call this fall back to
+    the global instance.
+    
+    Args:
+        app: Flask application instance
+        auth: Instance to register (defaults to the global instance)
+    """
+    app.extensions['api_key_auth'] = auth if auth is not None else _api_key_auth
+    logger.info("API key authentication configured")
+
+
 def require_api_key(f: Callable) -> Callable:
     """
     Decorator to require API key authentication for a route.
@@ -209,7 +251,7 @@ def require_api_key(f: Callable) -> Callable:
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth = get_api_key_auth()
+        auth = current_app.extensions.get('api_key_auth', _api_key_auth)
         
         # If auth is disabled, allow access
         if not auth.is_enabled():
@@ -309,7 +351,7 @@ def csrf_protect(f: Callable) -> Callable:
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        csrf = get_csrf_protection()
+        csrf = current_app.extensions.get('csrf', _csrf_protection)
         
         # Only protect state-changing methods
         if request.method in ('GET', 'HEAD', 'OPTIONS'):
@@ -352,7 +394,7 @@ def set_csrf_token(response: Response) -> Response:
     Returns:
         Response with CSRF token cookie
     """
-    csrf = get_csrf_protection()
+    csrf = current_app.extensions.get('csrf', _csrf_protection)
     
     if not csrf.is_enabled():
         return response
@@ -372,15 +414,19 @@ def set_csrf_token(response: Response) -> Response:
     return response
 
 
-def configure_csrf_protection(app) -> None:
+def configure_csrf_protection(app, csrf: Optional[CSRFProtection] = None) -> None:
     """
     Configure Flask app with CSRF protection.
     
-    Automatically sets CSRF token cookie on all responses.
+    Registers the CSRF instance in ``app.extensions['csrf']`` (used by
+    @csrf_protect) and automatically sets CSRF token cookie on all responses.
     
     Args:
         app: Flask application instance
+        csrf: Instance to register (defaults to the global instance)
     """
+    app.extensions['csrf'] = csrf if csrf is not None else _csrf_protection
+    
     @app.after_request
     def apply_csrf_token(response):
         return set_csrf_token(response)
@@ -9,11 +9,49 @@ This module provides validation functions for common input types:
 - Severity levels
 """
 
+import ipaddress
 import re
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
 
+# Precompiled patterns (avoid the re module cache lookup on every call)
+_TAG_RE = re.compile(r'\A[a-zA-Z0-9_-]+\Z')
+_IP_RE = re.compile(r'\A([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})\Z')
+
+# Translation table stripping MAC address separators and uppercasing hex
+# digits in a single pass (anything else left as-is fails hex validation)
+_MAC_TRANS = str.maketrans({
+    **{c: c.upper() for c in 'abcdef'},
+    **dict.fromkeys(':-. '),
+})
+
+# Translation table deleting uppercase hex digits (non-empty result = not hex)
+_NONHEX_TRANS = str.maketrans('', '', '0123456789ABCDEF')
+
+# Translation table escaping SQL LIKE wildcards for sanitize_sql_like_pattern
+_LIKE_ESCAPE = str.maketrans({'%': '\\%', '_': '\\_', '[': '\\[', ']': '\\]'})
+
+# Non-public IPv4 ranges as (network, mask) integer pairs for validate_ip_address
+_PRIVATE_RANGES = (
+    (0x00000000, 0xFF000000),  # 0.0.0.0/8 ("this" network)
+    (0x0A000000, 0xFF000000),  # 10.0.0.0/8
+    (0x64400000, 0xFFC00000),  # 100.64.0.0/10 (carrier-grade NAT)
+    (0x7F000000, 0xFF000000),  # 127.0.0.0/8 (loopback)
+    (0xA9FE0000, 0xFFFF0000),  # 169.254.0.0/16 (link-local)
+    (0xAC100000, 0xFFF00000),  # 172.16.0.0/12
+    (0xC0A80000, 0xFFFF0000),  # 192.168.0.0/16
+)
+
+# Default severity levels accepted by validate_severity (syslog names + 'info')
+_DEFAULT_SEVERITY_ORDER = (
+    'emergency', 'alert', 'critical', 'error', 'warning',
+    'notice', 'informational', 'info', 'debug'
+)
+_DEFAULT_SEVERITIES = frozenset(_DEFAULT_SEVERITY_ORDER)
+_DEFAULT_SEVERITIES_STR = ', '.join(_DEFAULT_SEVERITY_ORDER)
+
+
 class ValidationError(Exception):
     """Exception raised for validation errors."""
     pass
@@ -35,19 +73,24 @@ def validate_mac_address(mac: str) -> str:
     if not mac:
         raise ValidationError("MAC address is required")
         
+    # Cheap bound before any copying: 12 bare digits up to XX:XX:XX:XX:XX:XX
+    if not 12 <= len(mac) <= 17:
+        raise ValidationError(f"Invalid MAC address length: {mac[:32]}")
+        
     # Remove common separators and convert to uppercase
-    mac_clean = mac.upper().replace(':', '').replace('-', '').replace('.', '')
+    mac_clean = mac.translate(_MAC_TRANS)
     
     # Validate length
     if len(mac_clean) != 12:
         raise ValidationError(f"Invalid MAC address length: {mac}")
         
-    # Validate hex characters
-    if not all(c in '0123456789ABCDEF' for c in mac_clean):
+    # Validate hex characters: deleting every hex digit must leave nothing
+    if mac_clean.translate(_NONHEX_TRANS):
         raise ValidationError(f"Invalid MAC address format: {mac}")
         
     # Format as XX:XX:XX:XX:XX:XX
-    return ':'.join(mac_clean[i:i+2] for i in range(0, 12, 2))
+    m = mac_clean
+    return f"{m[0:2]}:{m[2:4]}:{m[4:6]}:{m[6:8]}:{m[8:10]}:{m[10:12]}"
 
 
 def validate_ip_address(ip: str, allow_private: bool = True) -> str:
@@ -59,7 +102,7 @@ def validate_ip_address(ip: str, allow_private: bool = True) -> str:
         allow_private: Whether to allow private IP ranges
         
     Returns:
-        Validated IP address
+        Validated IP address in canonical dotted-quad form
         
     Raises:
         ValidationError: If IP address is invalid
@@ -67,39 +110,47 @@ def validate_ip_address(ip: str, allow_private: bool = True) -> str:
     if not ip:
         raise ValidationError("IP address is required")
         
-    # Split into octets
-    parts = ip.split('.')
-    if len(parts) != 4:
+    # Reject malformed input and capture the octets in one regex pass
+    match = _IP_RE.match(ip)
+    if match is None:
         raise ValidationError(f"Invalid IP address format: {ip}")
         
-    # Validate each octet
     try:
-        octets = [int(p) for p in parts]
+        addr = ipaddress.IPv4Address(bytes(map(int, match.groups())))
     except ValueError:
-        raise ValidationError(f"Invalid IP address format: {ip}")
-        
-    for octet in octets:
-        if octet < 0 or octet > 255:
-            raise ValidationError(f"Invalid IP address range: {ip}")
+        # bytes() rejects any octet outside 0-255
+        raise ValidationError(f"Invalid IP address range: {ip}")
             
-    # Check for private IP ranges if not allowed
+    # Check for non-public ranges if not allowed (one AND + compare per range)
     if not allow_private:
-        first = octets[0]
-        second = octets[1]
-        
-        # 10.0.0.0/8
-        if first == 10:
+        ip_int = int(addr)
+        if any(ip_int & mask == network for network, mask in _PRIVATE_RANGES):
             raise ValidationError(f"Private IP address not allowed: {ip}")
             
-        # 172.16.0.0/12
-        if first == 172 and 16 <= second <= 31:
-            raise ValidationError(f"Private IP address not allowed: {ip}")
-            
-        # 192.168.0.0/16
-        if first == 192 and second == 168:
-            raise ValidationError(f"Private IP address not allowed: {ip}")
-            
-    return ip
+    return str(addr)
+
+
+def _parse_positive(value, default: int, label: str, name: str) -> int:
+    """
+    Parse a positive integer query parameter.
+    
+    Plain digit strings (the normal case for query parameters) are
+    converted directly; only other input goes through the try/except path.
+    """
+    if value is None:
+        return default
+    if isinstance(value, int):
+        number = value
+    elif isinstance(value, str) and value.isdecimal():
+        number = int(value)
+    else:
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(f"Invalid {label}: {value}")
+    if number < 1:
+        raise ValidationError(f"{name} must be >= 1")
+    return number
 
 
 def validate_pagination(page: Optional[str], limit: Optional[str], 
@@ -118,29 +169,11 @@ def validate_pagination(page: Optional[str], limit: Optional[str],
     Raises:
         ValidationError: If parameters are invalid
     """
-    # Default values
-    page_int = 1
-    limit_int = 50
+    page_int = _parse_positive(page, 1, 'page number', 'Page')
+    limit_int = _parse_positive(limit, 50, 'limit', 'Limit')
     
-    # Validate page
-    if page is not None:
-        try:
-            page_int = int(page)
-            if page_int < 1:
-                raise ValidationError("Page must be >= 1")
-        except ValueError:
-            raise ValidationError(f"Invalid page number: {page}")
-            
-    # Validate limit
-    if limit is not None:
-        try:
-            limit_int = int(limit)
-            if limit_int < 1:
-                raise ValidationError("Limit must be >= 1")
-            if limit_int > max_limit:
-                limit_int = max_limit  # Cap at max, don't error
-        except ValueError:
-            raise ValidationError(f"Invalid limit: {limit}")
+    if limit_int > max_limit:
+        limit_int = max_limit  # Cap at max, don't error
             
     return page_int, limit_int
 
@@ -164,22 +197,17 @@ def validate_date_range(start_date: Optional[str], end_date: Optional[str],
     start_dt = None
     end_dt = None
     
+    # datetime.fromisoformat accepts YYYY-MM-DD, full ISO datetimes and a
+    # trailing 'Z' (Python 3.11+, already required for datetime.UTC)
     if start_date:
         try:
-            # Try parsing as ISO datetime
-            if 'T' in start_date:
-                start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            else:
-                start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+            start_dt = datetime.fromisoformat(start_date)
         except ValueError:
             raise ValidationError(f"Invalid start date format: {start_date}")
             
     if end_date:
         try:
-            if 'T' in end_date:
-                end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            else:
-                end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+            end_dt = datetime.fromisoformat(end_date)
         except ValueError:
             raise ValidationError(f"Invalid end date format: {end_date}")
             
@@ -210,16 +238,20 @@ def validate_severity(severity: str, allowed_levels: Optional[list] = None) -> s
         ValidationError: If severity is invalid
     """
     if allowed_levels is None:
-        allowed_levels = [
-            'emergency', 'alert', 'critical', 'error', 'warning',
-            'notice', 'informational', 'info', 'debug'
-        ]
+        # Already-canonical input (the common case) needs no lower() copy
+        if severity in _DEFAULT_SEVERITIES:
+            return severity
+        levels = _DEFAULT_SEVERITIES
+        levels_str = _DEFAULT_SEVERITIES_STR
+    else:
+        levels = frozenset(level.lower() for level in allowed_levels)
+        levels_str = None
         
     severity_lower = severity.lower()
-    if severity_lower not in allowed_levels:
+    if severity_lower not in levels:
         raise ValidationError(
             f"Invalid severity level: {severity}. "
-            f"Allowed: {', '.join(allowed_levels)}"
+            f"Allowed: {levels_str or ', '.join(allowed_levels)}"
         )
         
     return severity_lower
@@ -297,7 +329,7 @@ def validate_tags(tags: str, max_tags: int = 10) -> list:
             raise ValidationError(f"Tag too long: {tag}")
             
         # Allow alphanumeric, dash, underscore
-        if not re.match(r'^[a-zA-Z0-9_-]+$', tag):
+        if not _TAG_RE.match(tag):
             raise ValidationError(f"Invalid tag format: {tag}")
             
     return tag_list
@@ -313,10 +345,5 @@ def sanitize_sql_like_pattern(pattern: str) -> str:
     Returns:
         Sanitized pattern with SQL wildcards escaped
     """
-    # Escape SQL special characters
-    pattern = pattern.replace('%', '\\%')
-    pattern = pattern.replace('_', '\\_')
-    pattern = pattern.replace('[', '\\[')
-    pattern = pattern.replace(']', '\\]')
-    
-    return pattern
+    # Escape SQL special characters in a single pass
+    return pattern.translate(_LIKE_ESCAPE)
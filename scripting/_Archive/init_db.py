@@ -10,6 +10,7 @@ import os
 import sys
 import sqlite3
 import argparse
+from urllib.request import pathname2url
 
 def get_script_dir():
     return os.path.dirname(os.path.abspath(__file__))
@@ -32,8 +33,12 @@ def init_database(db_path: str, force: bool = False):
         os.makedirs(db_dir, exist_ok=True)
         print(f"Created directory: {db_dir}")
     
-    # Check if database already exists
-    db_exists = os.path.exists(db_path)
+    # Check if database already exists (single stat call)
+    try:
+        os.stat(db_path)
+        db_exists = True
+    except FileNotFoundError:
+        db_exists = False
     if db_exists and not force:
         print(f"Database already exists at: {db_path}")
         print("Use --force to recreate the database (WARNING: this will delete all data)")
@@ -45,34 +50,54 @@ def init_database(db_path: str, force: bool = False):
     
     # Read schema file
     schema_path = get_schema_path()
-    if not os.path.exists(schema_path):
+    try:
+        with open(schema_path, 'r') as f:
+            schema_sql = f.read()
+    except FileNotFoundError:
         print(f"Schema file not found: {schema_path}")
         return False
     
-    with open(schema_path, 'r') as f:
-        schema_sql = f.read()
-    
     # Create database and apply schema
     try:
         conn = sqlite3.connect(db_path)
-        conn.executescript(schema_sql)
-        conn.commit()
-        conn.close()
-        print(f"Successfully created database: {db_path}")
-        print("Schema applied successfully.")
-        return True
+        try:
+            # The file is brand new, so skip fsync while the schema is applied.
+            # Keep the rollback journal in memory so a failing statement still
+            # rolls back; the script is run as-is since it may manage its own
+            # transactions.
+            conn.execute("PRAGMA journal_mode=MEMORY")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.executescript(schema_sql)
+            # Leave the file in WAL mode (persistent) to match db_manager.py;
+            # synchronous/locking_mode are per-connection and end with close().
+            conn.execute("PRAGMA locking_mode=NORMAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
     except Exception as e:
         print(f"Error creating database: {e}")
+        # Don't leave a half-initialized file for the next run to mistake
+        # for an existing database
+        if os.path.exists(db_path):
+            os.remove(db_path)
         return False
+    
+    print(f"Successfully created database: {db_path}")
+    print("Schema applied successfully.")
+    return True
 
 def verify_database(db_path: str):
     """Verify the database schema."""
-    if not os.path.exists(db_path):
+    # mode=rw fails fast on a missing file instead of creating an empty one
+    try:
+        conn = sqlite3.connect(f"file:{pathname2url(db_path)}?mode=rw", uri=True)
+    except sqlite3.OperationalError:
         print(f"Database not found: {db_path}")
         return False
     
     try:
-        conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
         # Check for expected tables
@@ -104,9 +129,11 @@ def verify_database(db_path: str):
         
         # Show row counts
         print("\nTable row counts:")
-        for table in expected_tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
+        # One statement for all tables instead of a round-trip per table
+        count_sql = " UNION ALL ".join(
+            f"SELECT '{table}', COUNT(*) FROM {table}" for table in expected_tables
+        )
+        for table, count in cursor.execute(count_sql).fetchall():
             print(f"  {table}: {count} rows")
         
         conn.close()
@@ -1,12 +1,77 @@
 """
 Shared test fixtures and utilities for pytest.
 """
+import importlib
 import os
+import sqlite3
 import sys
 
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 # Add the app directory to the path so tests can import app modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+# Import the app once for the whole session; test modules can use
+# ``from conftest import flask_app`` instead of repeating the path setup.
+import app as flask_app  # noqa: E402
+from app.rate_limiter import get_rate_limiter  # noqa: E402
+
+# The module the routes are defined in (the app package only delegates to it)
+app_module = importlib.import_module('app.app')
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'fixtures', 'schema-sqlite.sql')
+
+# Named shared-cache in-memory database: every connection opened on this URI
+# sees the same tables for as long as at least one of them stays open.
+MEMORY_DB_URI = 'file:dashboard_test?mode=memory&cache=shared'
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson for the test app.
+    
+    Dates and dataclasses are passed through to Flask's own ``default`` hook
+    (as are types orjson does not know, such as Decimal) so responses keep
+    the same shape; direct ``dumps`` calls with extra options such as
+    ``indent`` fall back to the stdlib implementation.
+    
+    Unlike Flask's provider (``ensure_ascii=True``), non-ASCII text is written
+    as UTF-8 rather than ``\\uXXXX`` escapes, so raw bodies can differ while
+    the decoded JSON is the same.
+    """
+    
+    _OPTIONS = (
+        orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    ) if orjson is not None else 0
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Flask's response() always passes separators/indent to dumps(),
+        # which would send every jsonify through the stdlib fallback
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
+
 
 def reset_rate_limiter():
     """
@@ -15,17 +80,98 @@ def reset_rate_limiter():
     This helper function resets all rate limiting state between tests
     to prevent test pollution and ensure tests are isolated.
     """
-    try:
-        import app as flask_app
-        if flask_app.PHASE1_FEATURES_AVAILABLE:
-            from app.rate_limiter import get_rate_limiter
-            rate_limiter = get_rate_limiter()
-            rate_limiter.reset_all()
-    except (ImportError, AttributeError):
-        # If Phase 1 features aren't available, silently continue
-        pass
+    get_rate_limiter().reset_all()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """
+    The dashboard Flask app, configured for testing once per session.
+    
+    Modules that need a differently configured app define their own
+    ``app`` fixture, which takes precedence over this one.
+    """
+    flask_app.app.config['TESTING'] = True
+    return flask_app.app
+
+
+@pytest.fixture(autouse=True)
+def orjson_json_provider(request):
+    """
+    Serialize JSON with orjson for tests that use the ``app`` fixture.
+    
+    The app's own provider is put back after each test, so tests that do
+    not request the app (directly or through ``client``) never see it.
+    """
+    if orjson is None or 'app' not in request.fixturenames:
+        yield
+        return
+    test_app = request.getfixturevalue('app')
+    original = test_app.json
+    test_app.json = OrjsonProvider(test_app)
+    yield
+    test_app.json = original
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    """Test client for the dashboard app, shared across the session."""
+    return app.test_client()
+
+
+def _no_db_connection():
+    return None
+
+
+@pytest.fixture
+def no_db(monkeypatch):
+    """
+    Make the app's get_db_connection report no database for one test.
+    
+    The ``app`` package only delegates attribute reads to ``app.app``, so
+    the stub is installed on the implementation module that the routes
+    actually resolve ``get_db_connection`` from.
+    """
+    monkeypatch.setattr(app_module, 'get_db_connection', _no_db_connection)
+
+
+def _connect_memory_db():
+    conn = sqlite3.connect(MEMORY_DB_URI, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+@pytest.fixture(scope="session")
+def memory_db():
+    """
+    Session-wide in-memory SQLite database with the app schema loaded once.
+    
+    The returned connection keeps the shared-cache database alive for the
+    whole session; tests use it to seed and inspect rows.
+    """
+    conn = _connect_memory_db()
+    with open(SCHEMA_PATH, 'r') as f:
+        conn.executescript(f.read())
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def sqlite_db(memory_db, monkeypatch):
+    """
+    Route the app's get_db_connection to the in-memory database for one test.
+    
+    Each call hands out a fresh connection (the routes close what they get),
+    and the ai_feedback table is emptied afterwards so tests stay isolated.
+    """
+    monkeypatch.setattr(app_module, 'get_db_connection', _connect_memory_db)
+    yield memory_db
+    memory_db.execute("DELETE FROM ai_feedback")
+    memory_db.execute("DELETE FROM sqlite_sequence WHERE name = 'ai_feedback'")
+    memory_db.commit()
 
 
 def pytest_ignore_collect(collection_path, config):
-    if collection_path.name == "test_db_connection.py" and "app" in str(collection_path):
+    # app/test_db_connection.py is a manual diagnostic script, not a test module
+    if collection_path.name == "test_db_connection.py" and collection_path.parent.name == "app":
         return True
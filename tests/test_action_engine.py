@@ -2,40 +2,54 @@
 
 import json
 import os
-import tempfile
+
+import pytest
 
 from app import action_engine
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def write_config(data):
-    fd, path = tempfile.mkstemp(suffix='.json')
-    with os.fdopen(fd, 'w') as f:
-        json.dump(data, f)
-    return path
 
+def write_config(tmp_path, data):
+    path = tmp_path / 'config.json'
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data))
+    else:
+        path.write_text(json.dumps(data))
+    return str(path)
 
-def test_can_execute_requires_approval(monkeypatch):
-    config_path = write_config({"Actions": {"RequireApproval": True}})
-    monkeypatch.setenv('SYSTEMDASHBOARD_CONFIG', config_path)
 
-    allowed, reason = action_engine.can_execute('dns_flush', approved=False)
-    assert allowed is False
-    assert 'approval' in reason.lower()
+@pytest.fixture
+def make_config(tmp_path, monkeypatch):
+    """Write a config file and point SYSTEMDASHBOARD_CONFIG at it."""
+    def _make(data):
+        config_path = write_config(tmp_path, data)
+        monkeypatch.setenv('SYSTEMDASHBOARD_CONFIG', config_path)
+        return config_path
+    return _make
 
 
-def test_can_execute_safe_action_with_approval(monkeypatch):
-    config_path = write_config({"Actions": {"RequireApproval": True, "SafeActions": ["dns_flush"]}})
-    monkeypatch.setenv('SYSTEMDASHBOARD_CONFIG', config_path)
+@pytest.mark.parametrize('actions_cfg,action_type,approved,expected_allowed,expected_reason', [
+    ({"RequireApproval": True}, 'dns_flush', False, False, 'approval'),
+    ({"RequireApproval": True, "SafeActions": ["dns_flush"]}, 'dns_flush', True, True, 'ok'),
+    ({"RequireApproval": False}, 'nope', True, False, 'unknown action type'),
+], ids=['requires_approval', 'safe_action_with_approval', 'blocks_unknown_action'])
+def test_can_execute(make_config, actions_cfg, action_type, approved, expected_allowed, expected_reason):
+    make_config({"Actions": actions_cfg})
 
-    allowed, reason = action_engine.can_execute('dns_flush', approved=True)
-    assert allowed is True
-    assert reason == 'ok'
+    allowed, reason = action_engine.can_execute(action_type, approved=approved)
+    assert allowed is expected_allowed
+    assert expected_reason in reason.lower()
 
 
-def test_can_execute_blocks_unknown_action(monkeypatch):
-    config_path = write_config({"Actions": {"RequireApproval": False}})
-    monkeypatch.setenv('SYSTEMDASHBOARD_CONFIG', config_path)
+def test_load_action_policy_picks_up_config_edits(make_config, tmp_path):
+    config_path = make_config({"Actions": {"RequireApproval": True}})
+    assert action_engine.load_action_policy()['require_approval'] is True
 
-    allowed, reason = action_engine.can_execute('nope', approved=True)
-    assert allowed is False
-    assert 'unknown action type' in reason.lower()
+    write_config(tmp_path, {"Actions": {"RequireApproval": False}})
+    st = os.stat(config_path)
+    os.utime(config_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert action_engine.load_action_policy()['require_approval'] is False
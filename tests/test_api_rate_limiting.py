@@ -1,38 +1,21 @@
 """Integration tests for API endpoint rate limiting."""
 
-import pytest
-import os
-import sys
-from flask import Flask
-
-# Add the app directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
-# Import the Flask app
-from app import app as flask_app
-from app.rate_limiter import get_rate_limiter
+import time
 
+import pytest
 
-@pytest.fixture
-def app():
-    """Create Flask app for testing."""
-    flask_app.config['TESTING'] = True
-    return flask_app
-
+from conftest import get_rate_limiter
 
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    return app.test_client()
+# Module-level singleton shared by every route's @rate_limit decorator
+LIMITER = get_rate_limiter()
 
 
 @pytest.fixture(autouse=True)
 def reset_rate_limiter():
     """Reset rate limiter before and after each test."""
-    limiter = get_rate_limiter()
-    limiter._requests.clear()
+    LIMITER.reset_all()
     yield
-    limiter._requests.clear()
+    LIMITER.reset_all()
 
 
 class TestAPIEndpointRateLimiting:
@@ -44,108 +27,47 @@ class TestAPIEndpointRateLimiting:
         for i in range(5):
             response = client.get('/api/dashboard/summary')
             assert response.status_code == 200
-            # Verify rate limit headers are present
-            assert 'X-RateLimit-Limit' in response.headers
+            # Verify rate limit headers are present and the limit is 60
+            assert response.headers['X-RateLimit-Limit'] == '60'
             assert 'X-RateLimit-Remaining' in response.headers
             assert 'X-RateLimit-Reset' in response.headers
-        
-        # Verify the limit is set to 60
-        response = client.get('/api/dashboard/summary')
-        assert response.headers['X-RateLimit-Limit'] == '60'
     
-    def test_router_logs_rate_limiting(self, client):
-        """Test /api/router/logs has rate limiting."""
-        response = client.get('/api/router/logs')
-        assert response.status_code == 200
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '60'
-    
-    def test_router_summary_rate_limiting(self, client):
-        """Test /api/router/summary has rate limiting."""
-        response = client.get('/api/router/summary')
-        assert response.status_code == 200
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '30'
-    
-    def test_events_rate_limiting(self, client):
-        """Test /api/events has rate limiting."""
-        response = client.get('/api/events')
-        assert response.status_code == 200
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '60'
-    
-    def test_events_summary_rate_limiting(self, client):
-        """Test /api/events/summary has rate limiting."""
-        response = client.get('/api/events/summary')
-        assert response.status_code == 200
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '30'
-    
-    def test_trends_rate_limiting(self, client):
-        """Test /api/trends has rate limiting."""
-        response = client.get('/api/trends')
-        assert response.status_code == 200
+    @pytest.mark.parametrize('endpoint,method,body,expected_limit,expected_status', [
+        ('/api/router/logs', 'GET', None, '60', 200),
+        ('/api/router/summary', 'GET', None, '30', 200),
+        ('/api/events', 'GET', None, '60', 200),
+        ('/api/events/summary', 'GET', None, '30', 200),
+        ('/api/trends', 'GET', None, '30', 200),
+        ('/api/lan/stats', 'GET', None, '60', 200),
+        ('/api/lan/devices', 'GET', None, '60', 200),
+        # AI endpoints have strict rate limiting (10 req/min); they may return
+        # 400 or 502 without an API key but still carry rate limit headers
+        ('/api/ai/suggest', 'POST', {'message': 'test', 'source': 'test'}, '10', None),
+        ('/api/ai/explain', 'POST', {'type': 'router_log', 'context': {'test': 'data'}}, '10', None),
+        # Write endpoints have stricter rate limiting (30 req/min); may return
+        # 403 or 503 depending on CSRF and DB availability
+        ('/api/lan/device/1/update', 'POST', {'nickname': 'test'}, '30', None),
+        # Expensive operations have very strict rate limiting (5-10 req/min)
+        ('/api/lan/devices/enrich-vendors', 'POST', None, '5', None),
+        ('/api/lan/device/1/lookup-vendor', 'POST', None, '10', None),
+    ])
+    def test_endpoint_rate_limit_header(self, client, endpoint, method, body,
+                                        expected_limit, expected_status):
+        """Test each API endpoint reports its configured rate limit."""
+        response = client.open(endpoint, method=method, json=body)
+        if expected_status is not None:
+            assert response.status_code == expected_status
         assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '30'
-    
-    def test_ai_endpoints_strict_rate_limiting(self, client):
-        """Test AI endpoints have strict rate limiting (10 req/min)."""
-        # Test /api/ai/suggest
-        response = client.post('/api/ai/suggest', json={'message': 'test', 'source': 'test'})
-        # May return 400 or 502 if missing required fields/API key, but should still have rate limit headers
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '10'
-        
-        # Test /api/ai/explain
-        response = client.post('/api/ai/explain', json={'type': 'router_log', 'context': {'test': 'data'}})
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '10'
-    
-    def test_lan_stats_rate_limiting(self, client):
-        """Test /api/lan/stats has rate limiting."""
-        response = client.get('/api/lan/stats')
-        assert response.status_code == 200
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '60'
-    
-    def test_lan_devices_rate_limiting(self, client):
-        """Test /api/lan/devices has rate limiting."""
-        response = client.get('/api/lan/devices')
-        assert response.status_code == 200
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '60'
-    
-    def test_lan_device_update_stricter_rate_limiting(self, client):
-        """Test write endpoints have stricter rate limiting (30 req/min)."""
-        # Test device update endpoint
-        response = client.post('/api/lan/device/1/update', json={'nickname': 'test'})
-        # May return 403 or 503 depending on CSRF and DB availability
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '30'
-    
-    def test_expensive_operations_very_strict_rate_limiting(self, client):
-        """Test expensive operations have very strict rate limiting (5-10 req/min)."""
-        # Test vendor enrichment (5 req/min)
-        response = client.post('/api/lan/devices/enrich-vendors')
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '5'
-        
-        # Test vendor lookup (10 req/min)
-        response = client.post('/api/lan/device/1/lookup-vendor')
-        assert 'X-RateLimit-Limit' in response.headers
-        assert response.headers['X-RateLimit-Limit'] == '10'
+        assert response.headers['X-RateLimit-Limit'] == expected_limit
     
     def test_rate_limit_blocks_excessive_requests(self, client):
         """Test that rate limiting actually blocks excessive requests."""
         # Use a low-limit endpoint for testing
         endpoint = '/api/router/summary'  # 30 req/min limit
         
-        # Make 30 successful requests
-        for i in range(30):
-            response = client.get(endpoint)
-            assert response.status_code == 200, f"Request {i+1} should succeed"
-            remaining = int(response.headers['X-RateLimit-Remaining'])
-            assert remaining == 29 - i, f"Remaining should be {29 - i} but got {remaining}"
+        # Prime the limiter with 30 in-window requests from the test client
+        # (the limiter keys on client address only, not on endpoint)
+        LIMITER._requests['127.0.0.1'].extend([time.time()] * 30)
         
         # 31st request should be blocked
         response = client.get(endpoint)
@@ -1,15 +1,12 @@
 """
 Test suite for API utilities.
 """
-import os
-import sys
 import pytest
-import time
+from types import SimpleNamespace
 from flask import Flask, jsonify, request
+from werkzeug.test import EnvironBuilder
 
-# Add the app directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-
+from app import api_utils
 from app.api_utils import (
     APIError, error_response, success_response,
     handle_api_errors, require_json, validate_required_fields,
@@ -18,20 +15,101 @@ from app.api_utils import (
 from app.validators import ValidationError
 
 
-@pytest.fixture
+# One app for the whole module. Every decorator under test wraps a route
+# registered once here that dispatches to whatever callable the current
+# test stores in _handlers, so tests never touch the URL map.
+_app = Flask(__name__)
+_app.config['TESTING'] = True
+_handlers = {}
+
+
+def _ok():
+    return jsonify({'result': 'ok'})
+
+
+@_app.route('/handle_errors')
+@handle_api_errors
+def handle_errors_route():
+    return _handlers['handle_errors']()
+
+
+@_app.route('/require_json', methods=['GET', 'POST'])
+@require_json
+def require_json_route():
+    return _ok()
+
+
+@_app.route('/validate_fields', methods=['POST'])
+@validate_required_fields(['name', 'email'])
+def validate_fields_route():
+    return _ok()
+
+
+@_app.route('/cache_a')
+@cache_response(ttl_seconds=60)
+def cache_a():
+    return _handlers['cache_a']()
+
+
+@_app.route('/cache_b')
+@cache_response(ttl_seconds=60)
+def cache_b():
+    return _handlers['cache_b']()
+
+
+@_app.route('/cache_c')
+@cache_response(ttl_seconds=1)  # Very short TTL
+def cache_c():
+    return _handlers['cache_c']()
+
+
+@_app.route('/cors', methods=['GET', 'POST', 'OPTIONS'])
+@with_cors
+def cors_route():
+    return _ok()
+
+
+def _raise(exc):
+    """Build a handler that raises ``exc`` when called."""
+    def handler():
+        raise exc
+    return handler
+
+
+def _counter(call_count):
+    """Build a handler that counts its calls in ``call_count[0]``."""
+    def handler():
+        call_count[0] += 1
+        return jsonify({'count': call_count[0]})
+    return handler
+
+
+# Prebuilt builders for the bodiless requests; the test client copies a
+# builder per call, so one instance serves every request to its route
+GET = {
+    path: EnvironBuilder(path=path, method='GET')
+    for path in ('/handle_errors', '/require_json', '/cache_a', '/cache_b', '/cache_c', '/cors')
+}
+
+
+@pytest.fixture(scope="module")
 def app():
-    """Create a test Flask app."""
-    app = Flask(__name__)
-    app.config['TESTING'] = True
-    return app
+    """The test Flask app shared by every test in this module."""
+    return _app
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client(app):
-    """Create a test client."""
+    """Create a test client shared by every test in this module."""
     return app.test_client()
 
 
+@pytest.fixture(autouse=True)
+def reset_handlers():
+    """Forget the handlers installed by the previous test."""
+    _handlers.clear()
+
+
 class TestAPIError:
     """Test APIError exception class."""
     
@@ -115,50 +193,40 @@ class TestSuccessResponse:
 class TestHandleApiErrors:
     """Test error handling decorator."""
     
-    def test_validation_error_handling(self, app, client):
+    def test_validation_error_handling(self, client):
         """Test handling of ValidationError."""
-        @app.route('/test')
-        @handle_api_errors
-        def test_route():
-            raise ValidationError("Invalid input")
+        _handlers['handle_errors'] = _raise(ValidationError("Invalid input"))
             
-        response = client.get('/test')
+        response = client.open(GET['/handle_errors'])
         assert response.status_code == 400
         data = response.get_json()
         assert 'Invalid input' in data['error']
         
-    def test_api_error_handling(self, app, client):
+    def test_api_error_handling(self, client):
         """Test handling of APIError."""
-        @app.route('/test')
-        @handle_api_errors
-        def test_route():
-            raise APIError("Not found", 404)
+        _handlers['handle_errors'] = _raise(APIError("Not found", 404))
             
-        response = client.get('/test')
+        response = client.open(GET['/handle_errors'])
         assert response.status_code == 404
         data = response.get_json()
         assert 'Not found' in data['error']
         
-    def test_generic_exception_handling(self, app, client):
+    def test_generic_exception_handling(self, client, monkeypatch):
         """Test handling of generic exceptions."""
-        @app.route('/test')
-        @handle_api_errors
-        def test_route():
-            raise ValueError("Something broke")
+        # Skip formatting the traceback the decorator logs with exc_info=True
+        monkeypatch.setattr(api_utils.logger, 'error', lambda *args, **kwargs: None)
+        _handlers['handle_errors'] = _raise(ValueError("Something broke"))
             
-        response = client.get('/test')
+        response = client.open(GET['/handle_errors'])
         assert response.status_code == 500
         data = response.get_json()
         assert 'Internal server error' in data['error']
         
-    def test_successful_execution(self, app, client):
+    def test_successful_execution(self, client):
         """Test that decorator doesn't interfere with successful execution."""
-        @app.route('/test')
-        @handle_api_errors
-        def test_route():
-            return jsonify({'result': 'ok'})
+        _handlers['handle_errors'] = _ok
             
-        response = client.get('/test')
+        response = client.open(GET['/handle_errors'])
         assert response.status_code == 200
         data = response.get_json()
         assert data['result'] == 'ok'
@@ -167,169 +235,120 @@ class TestHandleApiErrors:
 class TestRequireJson:
     """Test require_json decorator."""
     
-    def test_post_with_json(self, app, client):
+    def test_post_with_json(self, client):
         """Test POST request with JSON content type."""
-        @app.route('/test', methods=['POST'])
-        @require_json
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.post('/test', 
-                             json={'data': 'test'},
-                             content_type='application/json')
+        response = client.post('/require_json', 
+                             json={'data': 'test'})
         assert response.status_code == 200
         
-    def test_post_without_json(self, app, client):
+    def test_post_without_json(self, client):
         """Test POST request without JSON content type."""
-        @app.route('/test', methods=['POST'])
-        @require_json
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.post('/test', data='plain text')
+        response = client.post('/require_json', data='plain text')
         assert response.status_code == 415
         data = response.get_json()
         assert 'Content-Type' in data['error']
         
-    def test_get_without_json(self, app, client):
+    def test_get_without_json(self, client):
         """Test GET request doesn't require JSON."""
-        @app.route('/test')
-        @require_json
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.get('/test')
+        response = client.open(GET['/require_json'])
         assert response.status_code == 200
 
 
 class TestValidateRequiredFields:
     """Test validate_required_fields decorator."""
     
-    def test_all_fields_present(self, app, client):
+    def test_all_fields_present(self, client):
         """Test validation passes when all fields present."""
-        @app.route('/test', methods=['POST'])
-        @validate_required_fields(['name', 'email'])
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.post('/test',
+        response = client.post('/validate_fields',
                              json={'name': 'Test', 'email': 'test@example.com'})
         assert response.status_code == 200
         
-    def test_missing_field(self, app, client):
+    def test_missing_field(self, client):
         """Test validation fails when field missing."""
-        @app.route('/test', methods=['POST'])
-        @validate_required_fields(['name', 'email'])
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.post('/test', json={'name': 'Test'})
+        response = client.post('/validate_fields', json={'name': 'Test'})
         assert response.status_code == 400
         data = response.get_json()
         assert 'email' in data['error']
         assert 'missing_fields' in data
         
-    def test_empty_body(self, app, client):
+    def test_empty_body(self, client):
         """Test validation fails with empty body."""
-        @app.route('/test', methods=['POST'])
-        @validate_required_fields(['name'])
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.post('/test',
+        response = client.post('/validate_fields',
                              data='',
                              content_type='application/json')
         assert response.status_code == 400
 
 
+@pytest.mark.xdist_group('stateful')
 class TestCacheResponse:
     """Test response caching decorator."""
     
-    def test_cache_hit(self, app, client):
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        """Start and finish every cache test with an empty response cache."""
+        clear_cache()
+        yield
+        clear_cache()
+    
+    def test_cache_hit(self, client):
         """Test that cached response is returned."""
         call_count = [0]
-        
-        @app.route('/test')
-        @cache_response(ttl_seconds=60)
-        def test_route():
-            call_count[0] += 1
-            return jsonify({'count': call_count[0]})
+        _handlers['cache_a'] = _counter(call_count)
             
         # First call
-        response1 = client.get('/test')
+        response1 = client.open(GET['/cache_a'])
         data1 = response1.get_json()
         assert data1['count'] == 1
         
         # Second call should be cached
-        response2 = client.get('/test')
+        response2 = client.open(GET['/cache_a'])
         data2 = response2.get_json()
         assert data2['count'] == 1  # Same as first call
         assert call_count[0] == 1  # Function only called once
         
-    def test_cache_miss_after_expiry(self, app, client):
+    def test_cache_miss_after_expiry(self, client, monkeypatch):
         """Test that cache expires after TTL."""
-        # Clear any existing cache first
-        clear_cache()
+        # Drive the cache clock by hand instead of sleeping past the TTL
+        # (only api_utils sees the fake clock; time.time itself is untouched)
+        now = [1000.0]
+        monkeypatch.setattr(api_utils, 'time', SimpleNamespace(time=lambda: now[0]))
         
         call_count = [0]
-        
-        @app.route('/test_expiry')
-        @cache_response(ttl_seconds=1)  # Very short TTL
-        def test_route():
-            call_count[0] += 1
-            return jsonify({'count': call_count[0]})
+        _handlers['cache_c'] = _counter(call_count)
             
         # First call
-        response1 = client.get('/test_expiry')
+        response1 = client.open(GET['/cache_c'])
         data1 = response1.get_json()
         assert data1['count'] == 1
         assert call_count[0] == 1
         
-        # Wait for cache to expire
-        time.sleep(1.1)
+        # Jump past the 1 second TTL
+        now[0] += 2.0
         
         # Second call should execute function again
-        response2 = client.get('/test_expiry')
+        response2 = client.open(GET['/cache_c'])
         data2 = response2.get_json()
         assert data2['count'] == 2
         assert call_count[0] == 2
         
-    def test_cache_different_endpoints(self, app, client):
+    def test_cache_different_endpoints(self, client):
         """Test that different endpoints have separate caches."""
-        # Clear any existing cache first
-        clear_cache()
-        
-        @app.route('/test1_unique')
-        @cache_response(ttl_seconds=60)
-        def test1():
-            return jsonify({'endpoint': 'test1'})
+        _handlers['cache_a'] = lambda: jsonify({'endpoint': 'test1'})
+        _handlers['cache_b'] = lambda: jsonify({'endpoint': 'test2'})
             
-        @app.route('/test2_unique')
-        @cache_response(ttl_seconds=60)
-        def test2():
-            return jsonify({'endpoint': 'test2'})
-            
-        response1 = client.get('/test1_unique')
-        response2 = client.get('/test2_unique')
+        response1 = client.open(GET['/cache_a'])
+        response2 = client.open(GET['/cache_b'])
         
         assert response1.get_json()['endpoint'] == 'test1'
         assert response2.get_json()['endpoint'] == 'test2'
         
-    def test_clear_cache(self, app, client):
+    def test_clear_cache(self, client):
         """Test clearing the cache."""
-        # Clear any existing cache first
-        clear_cache()
-        
         call_count = [0]
-        
-        @app.route('/test_clear')
-        @cache_response(ttl_seconds=60)
-        def test_route():
-            call_count[0] += 1
-            return jsonify({'count': call_count[0]})
+        _handlers['cache_a'] = _counter(call_count)
             
         # First call
-        response1 = client.get('/test_clear')
+        response1 = client.open(GET['/cache_a'])
         assert call_count[0] == 1
         assert response1.get_json()['count'] == 1
         
@@ -337,7 +356,7 @@ class TestCacheResponse:
         clear_cache()
         
         # Should execute function again
-        response2 = client.get('/test_clear')
+        response2 = client.open(GET['/cache_a'])
         assert call_count[0] == 2
         assert response2.get_json()['count'] == 2
 
@@ -345,26 +364,18 @@ class TestCacheResponse:
 class TestCORSHeaders:
     """Test CORS header functionality."""
     
-    def test_with_cors_decorator(self, app, client):
+    def test_with_cors_decorator(self, client):
         """Test with_cors decorator adds headers."""
-        @app.route('/test')
-        @with_cors
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.get('/test')
+        response = client.open(GET['/cors'])
         assert response.status_code == 200
         assert 'Access-Control-Allow-Origin' in response.headers
         assert response.headers['Access-Control-Allow-Origin'] == '*'
         
-    def test_cors_preflight_request(self, app, client):
+    def test_cors_preflight_request(self, app):
         """Test CORS preflight OPTIONS request."""
-        @app.route('/test', methods=['GET', 'POST', 'OPTIONS'])
-        @with_cors
-        def test_route():
-            return jsonify({'result': 'ok'})
-            
-        response = client.options('/test')
+        # Call the decorated view directly; routing and WSGI add nothing here
+        with app.test_request_context('/cors', method='OPTIONS'):
+            response = cors_route()
         assert response.status_code == 200
         assert 'Access-Control-Allow-Methods' in response.headers
         assert 'Access-Control-Allow-Headers' in response.headers
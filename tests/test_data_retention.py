@@ -11,12 +11,13 @@ from datetime import datetime, timedelta, timezone
 # Add the app directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from app import data_retention
 from app.data_retention import DataRetentionManager, get_retention_manager
 
 
-@pytest.fixture
-def test_db():
-    """Create a test database with sample data."""
+@pytest.fixture(scope='session')
+def schema_template():
+    """Create the retention tables once for test_db to copy."""
     conn = sqlite3.connect(':memory:')
     cursor = conn.cursor()
     
@@ -58,51 +59,75 @@ def test_db():
     conn.close()
 
 
+@pytest.fixture
+def test_db(schema_template):
+    """Create an empty test database from the schema template."""
+    conn = sqlite3.connect(':memory:')
+    schema_template.backup(conn)
+    yield conn
+    conn.close()
+
+
 def insert_snapshots(conn, days_old_list):
     """Helper to insert test snapshots at various ages."""
-    cursor = conn.cursor()
-    for days_old in days_old_list:
-        timestamp = (datetime.now(timezone.utc) - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute(
-            "INSERT INTO device_snapshots (mac, timestamp, status) VALUES (?, ?, ?)",
-            ('AA:BB:CC:DD:EE:FF', timestamp, 'online')
-        )
+    now = datetime.now(timezone.utc)
+    rows = [
+        ('AA:BB:CC:DD:EE:FF',
+         (now - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S'),
+         'online')
+        for days_old in days_old_list
+    ]
+    conn.executemany(
+        "INSERT INTO device_snapshots (mac, timestamp, status) VALUES (?, ?, ?)",
+        rows
+    )
     conn.commit()
 
 
 def insert_alerts(conn, resolved_days_old_list, unresolved_days_old_list):
     """Helper to insert test alerts (both resolved and unresolved)."""
-    cursor = conn.cursor()
+    now = datetime.now(timezone.utc)
     
     # Insert resolved alerts
-    for days_old in resolved_days_old_list:
-        created_at = (datetime.now(timezone.utc) - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S')
-        resolved_at = (datetime.now(timezone.utc) - timedelta(days=days_old - 0.5)).strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute(
-            "INSERT INTO device_alerts (device_id, severity, message, created_at, resolved, resolved_at) VALUES (?, ?, ?, ?, ?, ?)",
-            (1, 'warning', 'Test alert', created_at, 1, resolved_at)
-        )
+    resolved_rows = [
+        (1, 'warning', 'Test alert',
+         (now - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S'),
+         1,
+         (now - timedelta(days=days_old - 0.5)).strftime('%Y-%m-%d %H:%M:%S'))
+        for days_old in resolved_days_old_list
+    ]
+    conn.executemany(
+        "INSERT INTO device_alerts (device_id, severity, message, created_at, resolved, resolved_at) VALUES (?, ?, ?, ?, ?, ?)",
+        resolved_rows
+    )
     
     # Insert unresolved alerts
-    for days_old in unresolved_days_old_list:
-        created_at = (datetime.now(timezone.utc) - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute(
-            "INSERT INTO device_alerts (device_id, severity, message, created_at, resolved) VALUES (?, ?, ?, ?, ?)",
-            (1, 'warning', 'Test alert', created_at, 0)
-        )
+    unresolved_rows = [
+        (1, 'warning', 'Test alert',
+         (now - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S'),
+         0)
+        for days_old in unresolved_days_old_list
+    ]
+    conn.executemany(
+        "INSERT INTO device_alerts (device_id, severity, message, created_at, resolved) VALUES (?, ?, ?, ?, ?)",
+        unresolved_rows
+    )
     
     conn.commit()
 
 
 def insert_syslog(conn, days_old_list):
     """Helper to insert test syslog entries."""
-    cursor = conn.cursor()
-    for days_old in days_old_list:
-        timestamp = (datetime.now(timezone.utc) - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S')
-        cursor.execute(
-            "INSERT INTO syslog_recent (timestamp, severity, message, source) VALUES (?, ?, ?, ?)",
-            (timestamp, 'info', 'Test log', 'router')
-        )
+    now = datetime.now(timezone.utc)
+    rows = [
+        ((now - timedelta(days=days_old)).strftime('%Y-%m-%d %H:%M:%S'),
+         'info', 'Test log', 'router')
+        for days_old in days_old_list
+    ]
+    conn.executemany(
+        "INSERT INTO syslog_recent (timestamp, severity, message, source) VALUES (?, ?, ?, ?)",
+        rows
+    )
     conn.commit()
 
 
@@ -114,51 +139,25 @@ class TestDataRetentionManager:
         manager = DataRetentionManager(test_db)
         assert manager.connection == test_db
     
-    def test_cleanup_old_snapshots_basic(self, test_db):
-        """Test basic snapshot cleanup."""
-        # Insert snapshots: 3, 5, 10, 15 days old
-        insert_snapshots(test_db, [3, 5, 10, 15])
+    @pytest.mark.parametrize('ages,retention,expected_deleted,expected_remaining', [
+        ([3, 5, 10, 15], 7, 2, 2),
+        ([1, 2, 3], 7, 0, 3),
+        ([10, 15, 20, 30], 7, 4, 0),
+    ], ids=['basic', 'none-to-delete', 'all-old'])
+    def test_cleanup_old_snapshots(self, test_db, ages, retention,
+                                   expected_deleted, expected_remaining):
+        """Test snapshot cleanup deletes only snapshots older than retention."""
+        insert_snapshots(test_db, ages)
         
         manager = DataRetentionManager(test_db)
-        deleted = manager.cleanup_old_snapshots(retention_days=7)
+        deleted = manager.cleanup_old_snapshots(retention_days=retention)
         
-        # Should delete 2 snapshots (10 and 15 days old)
-        assert deleted == 2
+        assert deleted == expected_deleted
         
         # Verify remaining count
         cursor = test_db.cursor()
         cursor.execute("SELECT COUNT(*) FROM device_snapshots")
-        assert cursor.fetchone()[0] == 2
-    
-    def test_cleanup_old_snapshots_none_to_delete(self, test_db):
-        """Test cleanup when no old snapshots exist."""
-        # Insert recent snapshots
-        insert_snapshots(test_db, [1, 2, 3])
-        
-        manager = DataRetentionManager(test_db)
-        deleted = manager.cleanup_old_snapshots(retention_days=7)
-        
-        assert deleted == 0
-        
-        # All snapshots should remain
-        cursor = test_db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM device_snapshots")
-        assert cursor.fetchone()[0] == 3
-    
-    def test_cleanup_old_snapshots_all_old(self, test_db):
-        """Test cleanup when all snapshots are old."""
-        # Insert old snapshots
-        insert_snapshots(test_db, [10, 15, 20, 30])
-        
-        manager = DataRetentionManager(test_db)
-        deleted = manager.cleanup_old_snapshots(retention_days=7)
-        
-        assert deleted == 4
-        
-        # No snapshots should remain
-        cursor = test_db.cursor()
-        cursor.execute("SELECT COUNT(*) FROM device_snapshots")
-        assert cursor.fetchone()[0] == 0
+        assert cursor.fetchone()[0] == expected_remaining
     
     def test_cleanup_old_snapshots_invalid_retention(self, test_db):
         """Test that invalid retention days raises error."""
@@ -336,10 +335,21 @@ class TestDataRetentionEdgeCases:
         with pytest.raises(sqlite3.OperationalError):
             manager.cleanup_old_snapshots(7)
     
-    def test_boundary_condition_exact_retention(self, test_db):
+    def test_boundary_condition_exact_retention(self, test_db, monkeypatch):
         """Test snapshot exactly at retention boundary."""
+        # Freeze the manager's clock so the cutoff cannot tick past the
+        # snapshot's second between the insert and the cleanup
+        now = datetime.now(timezone.utc)
+        
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now
+        
+        monkeypatch.setattr(data_retention, 'datetime', FrozenDatetime)
+        
         # Insert snapshot exactly 7 days old (to the second)
-        exactly_7_days = datetime.now(timezone.utc) - timedelta(days=7, seconds=0)
+        exactly_7_days = now - timedelta(days=7, seconds=0)
         cursor = test_db.cursor()
         cursor.execute(
             "INSERT INTO device_snapshots (mac, timestamp, status) VALUES (?, ?, ?)",
@@ -358,8 +368,9 @@ class TestDataRetentionEdgeCases:
         cursor = test_db.cursor()
         
         # Insert with different timestamp formats
-        old_time1 = (datetime.now(timezone.utc) - timedelta(days=10)).strftime('%Y-%m-%d %H:%M:%S')
-        old_time2 = (datetime.now(timezone.utc) - timedelta(days=15)).strftime('%Y-%m-%d %H:%M:%S.%f')
+        now = datetime.now(timezone.utc)
+        old_time1 = (now - timedelta(days=10)).strftime('%Y-%m-%d %H:%M:%S')
+        old_time2 = (now - timedelta(days=15)).strftime('%Y-%m-%d %H:%M:%S.%f')
         
         cursor.execute(
             "INSERT INTO device_snapshots (mac, timestamp, status) VALUES (?, ?, ?)",
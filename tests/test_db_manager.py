@@ -1,113 +1,155 @@
 """
 Test suite for database manager with connection pooling and retry logic.
 """
+import contextlib
+import logging
 import os
+import shutil
 import sys
 import tempfile
+import uuid
 import pytest
 import sqlite3
-import time
-from threading import Thread
-from unittest.mock import patch, MagicMock
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Condition, Thread, Timer
 
 # Add the app directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from app import db_manager
 from app.db_manager import ConnectionPool, DatabaseManager, get_db_manager
 
 
-@pytest.fixture
-def temp_db():
-    """Create a temporary database for testing."""
-    fd, path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
-    yield path
-    try:
-        os.unlink(path)
-    except Exception:
-        pass
-
-
-@pytest.fixture
-def db_with_schema(temp_db):
-    """Create a temporary database with test schema."""
-    conn = sqlite3.connect(temp_db)
-    cursor = conn.cursor()
+# Tables and views DatabaseManager.validate_schema() requires
+SCHEMA_SQL = '''
+    CREATE TABLE devices (
+        device_id INTEGER PRIMARY KEY,
+        mac_address TEXT NOT NULL UNIQUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
     
-    # Create required tables
-    cursor.execute('''
-        CREATE TABLE devices (
-            device_id INTEGER PRIMARY KEY,
-            mac_address TEXT NOT NULL UNIQUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    CREATE TABLE device_snapshots (
+        snapshot_id INTEGER PRIMARY KEY,
+        device_id INTEGER,
+        sample_time_utc TIMESTAMP,
+        FOREIGN KEY (device_id) REFERENCES devices(device_id)
+    );
     
-    cursor.execute('''
-        CREATE TABLE device_snapshots (
-            snapshot_id INTEGER PRIMARY KEY,
-            device_id INTEGER,
-            sample_time_utc TIMESTAMP,
-            FOREIGN KEY (device_id) REFERENCES devices(device_id)
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE device_alerts (
-            alert_id INTEGER PRIMARY KEY,
-            device_id INTEGER,
-            severity TEXT,
-            FOREIGN KEY (device_id) REFERENCES devices(device_id)
-        )
-    ''')
+    CREATE TABLE device_alerts (
+        alert_id INTEGER PRIMARY KEY,
+        device_id INTEGER,
+        severity TEXT,
+        FOREIGN KEY (device_id) REFERENCES devices(device_id)
+    );
     
-    cursor.execute('''
-        CREATE TABLE ai_feedback (
-            id INTEGER PRIMARY KEY,
-            message TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE syslog_recent (
-            id INTEGER PRIMARY KEY,
-            message TEXT,
-            received_utc TIMESTAMP
-        )
-    ''')
+    CREATE TABLE ai_feedback (
+        id INTEGER PRIMARY KEY,
+        message TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
     
-    # Create required views
-    cursor.execute('''
-        CREATE VIEW lan_summary_stats AS
-        SELECT COUNT(*) as total_devices FROM devices
-    ''')
+    CREATE TABLE syslog_recent (
+        id INTEGER PRIMARY KEY,
+        message TEXT,
+        received_utc TIMESTAMP
+    );
     
-    cursor.execute('''
-        CREATE VIEW device_alerts_active AS
-        SELECT * FROM device_alerts
-    ''')
+    CREATE VIEW lan_summary_stats AS
+    SELECT COUNT(*) as total_devices FROM devices;
     
-    conn.commit()
+    CREATE VIEW device_alerts_active AS
+    SELECT * FROM device_alerts;
+'''
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    """Create a temporary database path for testing."""
+    # tmp_path lives under a per-worker base directory when run with
+    # pytest-xdist, so parallel workers never share a database file
+    path = str(tmp_path / 'test.db')
+    yield path
+    # Pools left open by tests keep the WAL around; fold it back into the
+    # database so the retained tmp directories hold no -wal/-shm files
+    if os.path.exists(path):
+        with contextlib.closing(sqlite3.connect(path)) as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+
+def memory_db_uri():
+    """Return a URI for a fresh, uniquely named shared-cache memory database."""
+    return f"file:testdb_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+
+@pytest.fixture
+def mem_db():
+    """In-memory database URI for pool tests that do not need a file."""
+    return memory_db_uri()
+
+
+@pytest.fixture(scope='class')
+def pool():
+    """Connection pool shared by tests that only borrow connections."""
+    pool = ConnectionPool(memory_db_uri(), max_connections=5, uri=True)
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture(scope='session')
+def schema_template(tmp_path_factory):
+    """Build the test schema once into a template database file."""
+    path = str(tmp_path_factory.mktemp('db_template') / 'template.db')
+    conn = sqlite3.connect(path, isolation_level=None)
+    # Nothing needs to survive a crash mid-build, so skip the fsyncs
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute('PRAGMA journal_mode=MEMORY')
+    # Explicit transaction inside the script: executescript() would commit
+    # a BEGIN issued separately before running the DDL
+    conn.executescript(f'BEGIN;\n{SCHEMA_SQL}\nCOMMIT;')
     conn.close()
     
+    return path
+
+
+@pytest.fixture
+def db_with_schema(temp_db, schema_template):
+    """Create a temporary database with test schema."""
+    # The template is closed and not in WAL mode, so a file copy is a
+    # complete database
+    shutil.copyfile(schema_template, temp_db)
     yield temp_db
 
 
+@pytest.fixture
+def tuned_manager(db_with_schema):
+    """DatabaseManager on the schema database with test-only WAL companion pragmas."""
+    manager = DatabaseManager(db_with_schema, max_retries=5)
+    create_connection = manager.pool._create_connection
+    
+    # Pragmas are per connection, so apply them to every one the pool opens
+    def create_tuned_connection():
+        conn = create_connection()
+        conn.executescript(
+            "PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; PRAGMA mmap_size=134217728;"
+        )
+        return conn
+    
+    manager.pool._create_connection = create_tuned_connection
+    yield manager
+    manager.close()
+
 class TestConnectionPool:
     """Test connection pool functionality."""
     
-    def test_pool_creation(self, temp_db):
+    def test_pool_creation(self, mem_db):
         """Test that connection pool can be created."""
-        pool = ConnectionPool(temp_db, max_connections=3)
-        assert pool.db_path == temp_db
+        pool = ConnectionPool(mem_db, max_connections=3, uri=True)
+        assert pool.db_path == mem_db
         assert pool.max_connections == 3
         assert len(pool.connections) == 0
         
-    def test_get_connection(self, temp_db):
+    def test_get_connection(self, pool):
         """Test getting a connection from the pool."""
-        pool = ConnectionPool(temp_db)
-        
         with pool.get_connection() as conn:
             assert conn is not None
             cursor = conn.cursor()
@@ -115,10 +157,8 @@ class TestConnectionPool:
             result = cursor.fetchone()
             assert result[0] == 1
             
-    def test_connection_reuse(self, temp_db):
+    def test_connection_reuse(self, pool):
         """Test that connections are reused from the pool."""
-        pool = ConnectionPool(temp_db, max_connections=2)
-        
         # Get and release a connection
         with pool.get_connection() as conn1:
             conn1_id = id(conn1)
@@ -129,10 +169,12 @@ class TestConnectionPool:
             
         assert conn1_id == conn2_id
         
-    def test_concurrent_connections(self, temp_db):
+    def test_concurrent_connections(self, pool):
         """Test multiple concurrent connections."""
-        pool = ConnectionPool(temp_db, max_connections=5)
         results = []
+        # Every thread holds its connection until all ten have one, so the
+        # pool is exhausted and has to hand out temporary connections
+        barrier = Barrier(10)
         
         def query_db():
             with pool.get_connection() as conn:
@@ -140,7 +182,7 @@ class TestConnectionPool:
                 cursor.execute("SELECT 1")
                 result = cursor.fetchone()
                 results.append(result[0])
-                time.sleep(0.1)  # Simulate some work
+                barrier.wait(timeout=5)
                 
         # Create multiple threads
         threads = [Thread(target=query_db) for _ in range(10)]
@@ -154,6 +196,7 @@ class TestConnectionPool:
         
     def test_wal_mode_enabled(self, temp_db):
         """Test that WAL mode is enabled for connections."""
+        # Memory databases cannot use WAL, so this needs a real file
         pool = ConnectionPool(temp_db)
         
         with pool.get_connection() as conn:
@@ -162,19 +205,34 @@ class TestConnectionPool:
             mode = cursor.fetchone()[0]
             assert mode.lower() == 'wal'
             
-    def test_foreign_keys_enabled(self, temp_db):
+    def test_foreign_keys_enabled(self, pool):
         """Test that foreign keys are enabled."""
-        pool = ConnectionPool(temp_db)
-        
         with pool.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("PRAGMA foreign_keys")
             enabled = cursor.fetchone()[0]
             assert enabled == 1
             
-    def test_close_all_connections(self, temp_db):
+    def test_pool_uses_statement_cache(self, mem_db, monkeypatch):
+        """Test that pooled connections keep a statement cache of at least the default size."""
+        connect_kwargs = []
+        real_connect = sqlite3.connect
+        
+        def recording_connect(*args, **kwargs):
+            connect_kwargs.append(kwargs)
+            return real_connect(*args, **kwargs)
+        
+        monkeypatch.setattr(sqlite3, 'connect', recording_connect)
+        pool = ConnectionPool(mem_db, uri=True)
+        with pool.get_connection():
+            pass
+        pool.close_all()
+        
+        assert connect_kwargs[0].get('cached_statements', 0) >= 128
+            
+    def test_close_all_connections(self, mem_db):
         """Test closing all connections in the pool."""
-        pool = ConnectionPool(temp_db, max_connections=3)
+        pool = ConnectionPool(mem_db, max_connections=3, uri=True)
         
         # Create some connections
         with pool.get_connection() as conn1:
@@ -255,53 +313,40 @@ class TestDatabaseManager:
         assert is_valid is False
         assert any('view:' in m for m in missing)
         
-    def test_retry_on_locked_database(self, temp_db):
+    def test_retry_on_locked_database(self, temp_db, caplog):
         """Test retry logic when database is locked."""
-        manager = DatabaseManager(temp_db, max_retries=2)
+        manager = DatabaseManager(temp_db, max_retries=3)
+        # Fail fast on a held lock instead of waiting in SQLite's busy handler,
+        # so the manager's own retry path runs
+        manager.pool.timeout = 0
         
         # Create a table first
         manager.execute_with_retry('''
             CREATE TABLE test (id INTEGER PRIMARY KEY, value TEXT)
         ''')
         
-        # Mock the execute to fail once with locked error, then succeed
-        original_get_connection = manager.pool.get_connection
-        call_count = [0]
+        # Hold the write lock from a second real connection for ~50ms
+        blocker = sqlite3.connect(temp_db, isolation_level=None, check_same_thread=False)
+        blocker.execute('BEGIN EXCLUSIVE')
+        release = Timer(0.05, blocker.execute, args=('COMMIT',))
+        release.start()
         
-        class MockConnection:
-            def __init__(self, real_conn):
-                self.real_conn = real_conn
-                self.in_transaction = False
-                
-            def cursor(self):
-                call_count[0] += 1
-                if call_count[0] == 1:
-                    raise sqlite3.OperationalError("database is locked")
-                return self.real_conn.cursor()
-                
-            def commit(self):
-                return self.real_conn.commit()
-                
-            def rollback(self):
-                return self.real_conn.rollback()
-                
-            def close(self):
-                return self.real_conn.close()
-        
-        from contextlib import contextmanager
-        
-        @contextmanager
-        def mock_get_connection():
-            with original_get_connection() as conn:
-                yield MockConnection(conn)
-        
-        with patch.object(manager.pool, 'get_connection', mock_get_connection):
-            # Should retry and succeed
-            cursor = manager.execute_with_retry(
-                "INSERT INTO test (value) VALUES (?)",
-                ('test',)
-            )
-            assert call_count[0] == 2  # Failed once, succeeded on retry
+        try:
+            # Should retry and succeed once the lock is released
+            with caplog.at_level(logging.WARNING, logger='app.db_manager'):
+                manager.execute_with_retry(
+                    "INSERT INTO test (value) VALUES (?)",
+                    ('test',)
+                )
+        finally:
+            release.join()
+            blocker.close()
+            
+        assert any('Database locked, retrying' in r.getMessage() for r in caplog.records)
+        with manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM test")
+            assert cursor.fetchone()['value'] == 'test'
             
     def test_transaction_rollback_on_error(self, db_with_schema):
         """Test that transactions are rolled back on error."""
@@ -326,11 +371,52 @@ class TestDatabaseManager:
             cursor.execute("SELECT COUNT(*) as count FROM devices")
             count = cursor.fetchone()['count']
             assert count == 1
-
+            
+    def test_execute_many_is_atomic(self, db_with_schema):
+        """Test that a failing batch inserts none of its rows."""
+        manager = DatabaseManager(db_with_schema)
+        
+        # The duplicate MAC violates the UNIQUE constraint mid-batch
+        with pytest.raises(sqlite3.IntegrityError):
+            manager.execute_with_retry(
+                "INSERT INTO devices (mac_address) VALUES (?)",
+                [('AA:BB:CC:DD:EE:01',), ('AA:BB:CC:DD:EE:02',), ('AA:BB:CC:DD:EE:01',)],
+                many=True
+            )
+            
+        with manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) as count FROM devices")
+            count = cursor.fetchone()['count']
+            assert count == 0
+            
+    def test_execute_many_commits_replace(self, db_with_schema):
+        """Test that a batch commits even when the query isn't INSERT/UPDATE/DELETE."""
+        manager = DatabaseManager(db_with_schema)
+        
+        manager.execute_with_retry(
+            "REPLACE INTO devices (device_id, mac_address) VALUES (?, ?)",
+            [(1, 'AA:BB:CC:DD:EE:01'), (2, 'AA:BB:CC:DD:EE:02'), (1, 'AA:BB:CC:DD:EE:03')],
+            many=True
+        )
+        
+        with manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT device_id, mac_address FROM devices ORDER BY device_id")
+            rows = [tuple(row) for row in cursor.fetchall()]
+            assert rows == [(1, 'AA:BB:CC:DD:EE:03'), (2, 'AA:BB:CC:DD:EE:02')]
 
 class TestGetDbManager:
     """Test global database manager singleton."""
     
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self):
+        """Close and forget the global manager so no test sees another's instance."""
+        yield
+        if db_manager._db_manager is not None:
+            db_manager._db_manager.close()
+        db_manager._db_manager = None
+    
     def test_get_manager_creates_instance(self, temp_db):
         """Test that get_db_manager creates a new instance."""
         manager = get_db_manager(temp_db)
@@ -343,23 +429,27 @@ class TestGetDbManager:
         manager2 = get_db_manager(temp_db)
         assert manager1 is manager2
         
-    def test_get_manager_creates_new_for_different_path(self, temp_db):
+    def test_get_manager_creates_new_for_different_path(self, temp_db, tmp_path):
         """Test that get_db_manager creates new instance for different path."""
         manager1 = get_db_manager(temp_db)
         
-        # Create another temp db
-        fd, temp_db2 = tempfile.mkstemp(suffix='.db')
-        os.close(fd)
+        temp_db2 = str(tmp_path / 'other.db')
+        manager2 = get_db_manager(temp_db2)
+        assert manager1 is not manager2
+        assert manager2.db_path == temp_db2
+                
+    def test_get_manager_keeps_single_instance(self, temp_db, tmp_path):
+        """Test that switching paths closes the previous manager instead of caching it."""
+        manager1 = get_db_manager(temp_db)
+        with manager1.get_connection():
+            pass
+        assert len(manager1.pool.connections) == 1
         
-        try:
-            manager2 = get_db_manager(temp_db2)
-            assert manager1 is not manager2
-            assert manager2.db_path == temp_db2
-        finally:
-            try:
-                os.unlink(temp_db2)
-            except Exception:
-                pass
+        manager2 = get_db_manager(str(tmp_path / 'other.db'))
+        
+        # The registry is a single slot: the old pool is released, not kept
+        assert manager1.pool.connections == []
+        assert db_manager._db_manager is manager2
 
 
 class TestMigrations:
@@ -456,29 +546,23 @@ class TestMigrations:
 class TestConcurrentAccess:
     """Test concurrent database access scenarios."""
     
-    def test_concurrent_writes(self, db_with_schema):
+    def test_concurrent_writes(self, tuned_manager):
         """Test multiple concurrent write operations."""
-        manager = DatabaseManager(db_with_schema, max_retries=5)
-        errors = []
+        manager = tuned_manager
         
-        def insert_device(mac_suffix):
-            try:
-                manager.execute_with_retry(
-                    "INSERT INTO devices (mac_address) VALUES (?)",
-                    (f'AA:BB:CC:DD:EE:{mac_suffix:02X}',)
-                )
-            except Exception as e:
-                errors.append(str(e))
+        def insert_devices(first_suffix):
+            macs = [(f'AA:BB:CC:DD:EE:{suffix:02X}',)
+                    for suffix in range(first_suffix, first_suffix + 5)]
+            manager.execute_with_retry(
+                "INSERT INTO devices (mac_address) VALUES (?)",
+                macs,
+                many=True
+            )
                 
-        # Create multiple threads writing concurrently
-        threads = [Thread(target=insert_device, args=(i,)) for i in range(20)]
-        for t in threads:
-            t.start()
-        for t in threads:
-            t.join()
-            
-        # All writes should succeed
-        assert len(errors) == 0
+        # Write one batch per worker concurrently; map() re-raises the first
+        # failure, so all writes must succeed for this to return
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(insert_devices, range(0, 20, 5)))
         
         # Verify all records were inserted
         with manager.get_connection() as conn:
@@ -487,10 +571,12 @@ class TestConcurrentAccess:
             count = cursor.fetchone()['count']
             assert count == 20
             
-    def test_concurrent_read_write(self, db_with_schema):
+    def test_concurrent_read_write(self, tuned_manager):
         """Test concurrent reads and writes."""
-        manager = DatabaseManager(db_with_schema)
+        manager = tuned_manager
         results = []
+        progress = Condition()
+        written = [0]
         
         def writer():
             for i in range(5):
@@ -498,16 +584,21 @@ class TestConcurrentAccess:
                     "INSERT INTO devices (mac_address) VALUES (?)",
                     (f'AA:BB:CC:DD:{i:02X}:FF',)
                 )
-                time.sleep(0.01)
+                with progress:
+                    written[0] += 1
+                    progress.notify_all()
                 
         def reader():
-            for _ in range(10):
+            for i in range(10):
+                # Pace reads against the writer: two reads per insert, the
+                # last ones only after every insert has landed
+                with progress:
+                    progress.wait_for(lambda: written[0] >= min(i // 2 + 1, 5), timeout=5)
                 with manager.get_connection() as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT COUNT(*) as count FROM devices")
                     count = cursor.fetchone()['count']
                     results.append(count)
-                time.sleep(0.01)
                 
         # Start writer and multiple readers
         writer_thread = Thread(target=writer)
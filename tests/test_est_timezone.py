@@ -46,6 +46,13 @@ def test_to_est_string_with_iso_string():
     assert '-04:00' in result
 
 
+def test_to_est_string_with_fractional_iso_string():
+    """Test conversion of a 'Z'-suffixed ISO string with fractional seconds."""
+    result = flask_app._to_est_string("2024-01-15T12:00:00.250Z")
+    
+    assert result == '2024-01-15T07:00:00.250000-05:00'
+
+
 def test_to_est_string_with_none():
     """Test that None input returns empty string."""
     result = flask_app._to_est_string(None)
@@ -1,9 +1,9 @@
 """
 Test suite for Flask app functionality and data source validation.
 """
+import importlib
 import os
 import sys
-import tempfile
 import pytest
 import json
 from unittest.mock import patch, mock_open
@@ -13,6 +13,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 import app as flask_app
 
+# The module the routes are defined in; patch targets must live here because
+# the app package only delegates attribute reads to it.
+app_module = importlib.import_module('app.app')
+
 
 @pytest.fixture
 def client():
@@ -62,7 +66,7 @@ class TestDataSources:
         result = flask_app._is_windows()
         assert isinstance(result, bool)
 
-    @patch('app.subprocess.run')
+    @patch.object(app_module.subprocess, 'run')
     def test_get_windows_events_mocked(self, mock_subprocess):
         """Test Windows events retrieval with mocked subprocess."""
         # Mock successful PowerShell execution
@@ -78,7 +82,7 @@ class TestDataSources:
         })
         mock_subprocess.return_value = mock_result
         
-        with patch('app._is_windows', return_value=True):
+        with patch.object(app_module, '_is_windows', return_value=True):
             events = flask_app.get_windows_events()
             
         assert len(events) == 1
@@ -92,31 +96,26 @@ class TestDataSources:
             logs = flask_app.get_router_logs()
             assert logs == []
 
-    def test_get_router_logs_with_valid_file(self):
+    def test_get_router_logs_with_valid_file(self, tmp_path):
         """Test router logs with a valid log file."""
         log_content = """2024-01-01 12:00:00 INFO Test log message
 2024-01-01 12:01:00 WARN Another test message
 2024-01-01 12:02:00 ERROR Error message here"""
+        log_file = tmp_path / 'router.log'
+        log_file.write_text(log_content)
         
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.log') as f:
-            f.write(log_content)
-            f.flush()
-            
-            try:
-                with patch.dict(os.environ, {'ROUTER_LOG_PATH': f.name}):
-                    logs = flask_app.get_router_logs()
-                
-                assert len(logs) == 3
-                assert logs[0]['time'] == '2024-01-01 12:00:00'
-                assert logs[0]['level'] == 'INFO'
-                assert logs[0]['message'] == 'Test log message'
-                
-                assert logs[2]['level'] == 'ERROR'
-                assert 'Error message' in logs[2]['message']
-            finally:
-                os.unlink(f.name)
-
-    @patch('app.subprocess.run')
+        with patch.dict(os.environ, {'ROUTER_LOG_PATH': str(log_file)}):
+            logs = flask_app.get_router_logs()
+        
+        assert len(logs) == 3
+        assert logs[0]['time'] == '2024-01-01 12:00:00'
+        assert logs[0]['level'] == 'INFO'
+        assert logs[0]['message'] == 'Test log message'
+        
+        assert logs[2]['level'] == 'ERROR'
+        assert 'Error message' in logs[2]['message']
+
+    @patch.object(app_module.subprocess, 'run')
     def test_get_wifi_clients_mocked(self, mock_subprocess):
         """Test WiFi clients retrieval with mocked subprocess."""
         # Mock ARP table output
@@ -134,34 +133,28 @@ class TestDataSources:
         clients = flask_app.get_wifi_clients()
         assert len(clients) >= 0  # May be empty if parsing doesn't match exactly
 
-    def test_router_logs_parsing_edge_cases(self):
+    def test_router_logs_parsing_edge_cases(self, tmp_path):
         """Test router log parsing with various line formats."""
         log_content = """2024-01-01 12:00:00 INFO Complete log line
 Incomplete line
 2024-01-01 12:01:00 WARN
 2024-01-01 12:02:00 ERROR Multi word message here"""
+        log_file = tmp_path / 'router.log'
+        log_file.write_text(log_content)
         
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.log') as f:
-            f.write(log_content)
-            f.flush()
-            
-            try:
-                with patch.dict(os.environ, {'ROUTER_LOG_PATH': f.name}):
-                    logs = flask_app.get_router_logs()
-                
-                assert len(logs) == 4
-                
-                # Check complete line
-                assert logs[0]['time'] == '2024-01-01 12:00:00'
-                assert logs[0]['level'] == 'INFO'
-                
-                # Check incomplete line handling
-                assert logs[1]['time'] == ''
-                assert logs[1]['level'] == ''
-                assert logs[1]['message'] == 'Incomplete line'
-                
-            finally:
-                os.unlink(f.name)
+        with patch.dict(os.environ, {'ROUTER_LOG_PATH': str(log_file)}):
+            logs = flask_app.get_router_logs()
+        
+        assert len(logs) == 4
+        
+        # Check complete line
+        assert logs[0]['time'] == '2024-01-01 12:00:00'
+        assert logs[0]['level'] == 'INFO'
+        
+        # Check incomplete line handling
+        assert logs[1]['time'] == ''
+        assert logs[1]['level'] == ''
+        assert logs[1]['message'] == 'Incomplete line'
 
 
 class TestAPIEndpoints:
@@ -187,8 +180,7 @@ class TestAPIEndpoints:
     def test_api_ai_suggest_missing_message(self, client):
         """Test AI suggest API with missing message."""
         response = client.post('/api/ai/suggest', 
-                             json={},
-                             content_type='application/json')
+                             json={})
         assert response.status_code == 400
         
         data = json.loads(response.data)
@@ -196,7 +188,7 @@ class TestAPIEndpoints:
 
     def test_api_ai_suggest_with_message(self, client):
         """Test AI suggest API with valid message."""
-        with patch('app.call_openai_chat') as mock_openai:
+        with patch.object(app_module, 'call_openai_chat') as mock_openai:
             mock_openai.return_value = ("Test suggestion", None)
             
             response = client.post('/api/ai/suggest',
@@ -204,8 +196,7 @@ class TestAPIEndpoints:
                                      'message': 'Test error message',
                                      'source': 'Test Source',
                                      'id': 1234
-                                 },
-                                 content_type='application/json')
+                                 })
             
             assert response.status_code == 200
             data = json.loads(response.data)
@@ -214,12 +205,11 @@ class TestAPIEndpoints:
 
     def test_api_ai_suggest_with_error(self, client):
         """Test AI suggest API when OpenAI returns error."""
-        with patch('app.call_openai_chat') as mock_openai:
+        with patch.object(app_module, 'call_openai_chat') as mock_openai:
             mock_openai.return_value = (None, "API key not configured")
             
             response = client.post('/api/ai/suggest',
-                                 json={'message': 'Test message'},
-                                 content_type='application/json')
+                                 json={'message': 'Test message'})
             
             assert response.status_code == 502
             data = json.loads(response.data)
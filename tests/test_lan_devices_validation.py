@@ -409,8 +409,7 @@ class TestDeviceDetailApi:
     def test_api_lan_device_update(self, client_with_populated_db):
         """Verify device update API works correctly."""
         response = client_with_populated_db.post('/api/lan/device/1/update',
-            json={'nickname': 'My Laptop', 'location': 'Office'},
-            content_type='application/json')
+            json={'nickname': 'My Laptop', 'location': 'Office'})
         assert response.status_code == 200
         
         data = json.loads(response.data)
@@ -21,6 +21,7 @@ from app.security import (
     add_security_headers, configure_security_headers,
     APIKeyAuth, get_api_key_auth, require_api_key,
     CSRFProtection, get_csrf_protection, csrf_protect,
+    configure_api_key_auth, configure_csrf_protection,
     sanitize_path, validate_sql_identifier
 )
 
@@ -121,6 +122,32 @@ def test_api_key_auth_multiple_keys():
     assert not auth.verify_key('key3')
 
 
+def test_api_key_auth_single_key_fast_path():
+    """Test that the single-key fast path is installed and torn down correctly."""
+    auth = APIKeyAuth()
+    
+    auth.add_key('only-key', 'only')
+    assert auth.verify_key == auth._verify_single
+    assert auth.verify_key('only-key')
+    assert not auth.verify_key('wrong-key')
+    
+    # A second key falls back to the general path
+    auth.add_key('other-key', 'other')
+    assert auth.verify_key != auth._verify_single
+    assert auth.verify_key('only-key')
+    assert auth.verify_key('other-key')
+    
+    # Dropping back to one key re-installs the fast path
+    auth.remove_key('only')
+    assert auth.verify_key == auth._verify_single
+    assert auth.verify_key('other-key')
+    assert not auth.verify_key('only-key')
+    
+    # Disabling auth still allows access on the fast path
+    auth.set_enabled(False)
+    assert auth.verify_key('anything')
+
+
 def test_require_api_key_decorator():
     """Test @require_api_key decorator."""
     app = Flask(__name__)
@@ -173,6 +200,27 @@ def test_require_api_key_when_disabled():
         assert response.status_code == 200
 
 
+def test_require_api_key_uses_app_scoped_instance():
+    """Test that @require_api_key uses the instance registered on the app."""
+    app = Flask(__name__)
+    
+    auth = APIKeyAuth()
+    auth.add_key('app-key')
+    configure_api_key_auth(app, auth)
+    
+    @app.route('/protected')
+    @require_api_key
+    def protected():
+        return jsonify({'status': 'ok'})
+    
+    with app.test_client() as client:
+        response = client.get('/protected')
+        assert response.status_code == 401
+        
+        response = client.get('/protected', headers={'X-API-Key': 'app-key'})
+        assert response.status_code == 200
+
+
 # ============================================================================
 # CSRF Protection Tests
 # ============================================================================
@@ -283,6 +331,29 @@ def test_csrf_token_from_form_field():
         assert response.status_code == 200
 
 
+def test_csrf_protect_uses_app_scoped_instance(monkeypatch):
+    """Test that @csrf_protect uses the instance registered on the app."""
+    app = Flask(__name__)
+    
+    csrf = CSRFProtection()
+    csrf.set_enabled(False)
+    configure_csrf_protection(app, csrf)
+    assert app.extensions['csrf'] is csrf
+    
+    @app.route('/api/update', methods=['POST'])
+    @csrf_protect
+    def api_update():
+        return jsonify({'status': 'updated'})
+    
+    # Enable the global instance for this test only
+    monkeypatch.setattr(get_csrf_protection(), 'is_enabled', lambda: True)
+    with app.test_client() as client:
+        # App-scoped instance is disabled, so no token is required
+        response = client.post('/api/update')
+        assert response.status_code == 200
+        assert 'csrf_token' not in response.headers.get('Set-Cookie', '')
+
+
 # ============================================================================
 # Input Sanitization Tests
 # ============================================================================
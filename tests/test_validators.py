@@ -45,11 +45,28 @@ class TestMACAddressValidation:
         with pytest.raises(ValidationError, match="Invalid MAC address length"):
             validate_mac_address('AA:BB:CC')
             
+    def test_oversized_mac_truncated_in_error(self):
+        """Test oversized input is rejected without echoing it in full."""
+        with pytest.raises(ValidationError, match="Invalid MAC address length") as exc_info:
+            validate_mac_address('A' * 10000)
+        assert len(str(exc_info.value)) < 100
+            
     def test_invalid_mac_characters(self):
         """Test validation rejects non-hex characters."""
         with pytest.raises(ValidationError, match="Invalid MAC address format"):
             validate_mac_address('GG:HH:II:JJ:KK:LL')
             
+    def test_valid_mac_dotted_format(self):
+        """Test validation of MAC in Cisco XXXX.XXXX.XXXX format."""
+        result = validate_mac_address('aabb.ccdd.eeff')
+        assert result == 'AA:BB:CC:DD:EE:FF'
+        
+    def test_invalid_mac_int_literal_syntax(self):
+        """Test validation rejects prefixes and underscores int(x, 16) accepts."""
+        for mac in ('0XAABBCCDDEE', 'AA_BBCCDDEEF', 'AABBCCDDEE\t\t'):
+            with pytest.raises(ValidationError, match="Invalid MAC address format"):
+                validate_mac_address(mac)
+            
     def test_empty_mac(self):
         """Test validation rejects empty MAC."""
         with pytest.raises(ValidationError, match="MAC address is required"):
@@ -84,6 +101,27 @@ class TestIPAddressValidation:
         with pytest.raises(ValidationError, match="Private IP address not allowed"):
             validate_ip_address('172.16.0.1', allow_private=False)
             
+    def test_loopback_and_link_local_rejected(self):
+        """Test validation treats loopback, link-local and CGNAT as private."""
+        for ip in ('127.0.0.1', '169.254.10.20', '100.64.0.1', '0.0.0.0'):
+            with pytest.raises(ValidationError, match="Private IP address not allowed"):
+                validate_ip_address(ip, allow_private=False)
+                
+    def test_private_range_boundaries(self):
+        """Test addresses just outside the private ranges are public."""
+        for ip in ('172.15.255.255', '172.32.0.0', '192.167.255.255', '100.128.0.0'):
+            assert validate_ip_address(ip, allow_private=False) == ip
+                
+    def test_signed_and_padded_octets_rejected(self):
+        """Test validation rejects octets int() would otherwise accept."""
+        for ip in ('+1.2.3.4', '1.2.3.-4', ' 1.2.3.4', '1.2.3.4 ', '1e2.2.3.4', '1.2.3.4\n'):
+            with pytest.raises(ValidationError, match="Invalid IP address format"):
+                validate_ip_address(ip)
+            
+    def test_ip_returned_in_canonical_form(self):
+        """Test zero-padded octets are normalized to canonical form."""
+        assert validate_ip_address('008.008.008.008') == '8.8.8.8'
+            
     def test_invalid_ip_format(self):
         """Test validation rejects invalid format."""
         with pytest.raises(ValidationError, match="Invalid IP address range"):
@@ -160,6 +198,12 @@ class TestDateRangeValidation:
         assert start.hour == 0
         assert end.hour == 23
         
+    def test_valid_utc_z_suffix(self):
+        """Test validation accepts a trailing 'Z' UTC designator."""
+        start, end = validate_date_range('2024-01-01T00:00:00Z', '2024-01-02T00:00:00Z')
+        assert start.utcoffset() == timedelta(0)
+        assert end.day == 2
+        
     def test_none_dates(self):
         """Test validation with None dates."""
         start, end = validate_date_range(None, None)
@@ -213,6 +257,11 @@ class TestSeverityValidation:
         with pytest.raises(ValidationError, match="Invalid severity level"):
             validate_severity('invalid_level')
             
+    def test_invalid_severity_lists_allowed_levels(self):
+        """Test the error message lists the default levels in order."""
+        with pytest.raises(ValidationError, match="Allowed: emergency, alert, critical"):
+            validate_severity('bogus')
+            
     def test_custom_allowed_levels(self):
         """Test validation with custom allowed levels."""
         result = validate_severity('high', allowed_levels=['low', 'medium', 'high'])